@@ -1,5 +1,7 @@
+import threading
+
+from pydantic import PrivateAttr
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from functools import lru_cache
 
 
 class Settings(BaseSettings):
@@ -12,6 +14,13 @@ class Settings(BaseSettings):
     postgres_password: str
     postgres_db: str
     database_url: str
+    auto_create_tables: bool = True
+    
+    # Database connection pool (per worker process)
+    db_pool_size: int = 20
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 5
+    db_pool_recycle: int = 3600
     
     # API Settings
     api_title: str
@@ -20,27 +29,59 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: str
     
+    # Static images: when set (e.g. "/_protected_images"), image routes answer
+    # with an X-Accel-Redirect to this internal nginx location instead of
+    # streaming the file through the app
+    x_accel_redirect_prefix: str | None = None
+    
+    # Uploads: PDFs larger than this are rejected with 413
+    max_upload_mb: int = 50
+    
     # Security
     jwt_secret: str
     jwt_issuer: str
     jwt_audience: str
     algorithm: str
     access_token_expire_minutes: int
+    
+    # Logging
+    log_level: str = "INFO"
 
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=False
     )
-    
-    def get_cors_origins_list(self) -> list[str]:
-        """Parse comma-separated CORS origins into a list."""
-        return [origin.strip() for origin in self.cors_origins.split(",")]
+
+    _cors_origins_list: tuple[str, ...] = PrivateAttr(default=())
+
+    def model_post_init(self, __context) -> None:
+        """Parse comma-separated CORS origins once, at construction."""
+        self._cors_origins_list = tuple(
+            origin.strip() for origin in self.cors_origins.split(",")
+        )
+
+    def get_cors_origins_list(self) -> tuple[str, ...]:
+        """Return the CORS origins parsed from the comma-separated setting."""
+        return self._cors_origins_list
+
+
+_settings: Settings | None = None
+_settings_lock = threading.Lock()
 
 
-@lru_cache()
 def get_settings() -> Settings:
     """
     Get cached settings instance.
     Use this in dependencies.
+
+    The instance is built once under a lock so concurrent first calls
+    don't each re-parse the .env file.
     """
-    return Settings()
+    global _settings
+    settings = _settings
+    if settings is not None:
+        return settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = Settings()
+        return _settings
@@ -10,9 +10,11 @@ settings = get_settings()
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    pool_recycle=3600,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,  # Fail fast instead of queueing requests
+    pool_use_lifo=True,  # Reuse the most recently returned (warm) connection
     echo=False  # Set to True for SQL query logging
 )
 
@@ -40,11 +42,18 @@ def get_db() -> Generator:
         db.close()
 
 
-def init_db():
+def init_db(force: bool = False):
     """
     Initialize database - create all tables.
     Call this on application startup.
+    
+    Skipped unless AUTO_CREATE_TABLES is enabled (the default) or force is
+    True, so deployments with a managed schema avoid the per-table
+    introspection round trips on every start.
     """
+    if not (force or settings.auto_create_tables):
+        return
+    
     # Import all models here so they are registered with Base
     from app.models import db_models  # noqa: F401
     
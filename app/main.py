@@ -5,14 +5,23 @@ from pathlib import Path
 if __name__ == "__main__":
     sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.routers import answer, question
-from app.models.question import Question
-from app.models.db_models import QuestionDB, AnswerDB
-from sqlalchemy.orm import Session
-from fastapi import Depends, FastAPI
+import logging
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
-from app.database import get_db, init_db
-from app.routers import extraction
+from app.config import get_settings
+from app.database import init_db
+from app.routers import answer, extraction, question
+
+
+# Configure root logging once; uvicorn --reload re-imports this module.
+# Application code should log with lazy %-style arguments, e.g.
+# logger.debug("extracted %d questions", n), not f-strings.
+if not logging.getLogger().handlers:
+    logging.basicConfig(
+        level=get_settings().log_level.upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
 
 
 @asynccontextmanager
@@ -31,7 +40,8 @@ app = FastAPI(
     title="Thesis Tests Microservice",
     description="API for managing thesis test questions and answers",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # Register routers
@@ -54,5 +64,13 @@ def health_check():
     return {"status": "ok"}
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8070)
\ No newline at end of file
+    # uvicorn picks uvloop/httptools automatically when installed (uvicorn[standard])
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=8070,
+        access_log=False,
+        workers=int(os.getenv("WEB_CONCURRENCY", "1"))
+    )
\ No newline at end of file
@@ -7,12 +7,14 @@ from pydantic import BaseModel, Field, ConfigDict
 class AnswerBase(BaseModel):
     """Base model for Answer with common fields."""
     path_to_answer: str = Field(..., description="Path to the answer file", min_length=1)
+    path_to_explanation: Optional[str] = Field(None, description="Path to the explanation (steps) file", min_length=1)
     question_number: Optional[int] = Field(None, description="Question number in sequence", ge=1)    
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "path_to_answer": "/answers/math/a1.png",
+                "path_to_explanation": "/answers/math/a1_steps.png",
                 "question_number": 1
             }
         }
@@ -28,6 +30,7 @@ class Answer(AnswerBase):
             "example": {
                 "id": 1,
                 "path_to_answer": "/answers/math/a1.png",
+                "path_to_explanation": "/answers/math/a1_steps.png",
                 "question_number": 1
             }
         }
@@ -40,12 +43,14 @@ class AnswerCreate(AnswerBase):
 class AnswerUpdate(BaseModel):
     """Model for updating an existing Answer (all fields optional)."""
     path_to_answer: Optional[str] = Field(None, description="Path to the answer file", min_length=1)
+    path_to_explanation: Optional[str] = Field(None, description="Path to the explanation (steps) file", min_length=1)
     question_number: Optional[int] = Field(None, description="Question number in sequence", ge=1)
 
     model_config = ConfigDict(
         json_schema_extra={
             "example": {
                 "path_to_answer": "/answers/math/a2.png",
+                "path_to_explanation": "/answers/math/a2_steps.png",
                 "question_number": 2
             }
         }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, Index, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -24,6 +24,7 @@ class AnswerDB(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     path_to_answer = Column(String(500), nullable=False)
+    path_to_explanation = Column(String(500), nullable=True)  # Steps image, when the barem has one
     question_number = Column(Integer, nullable=True)
     
     # Relationship to questions
@@ -36,10 +37,20 @@ class QuestionDB(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     path_to_question = Column(String(500), nullable=False)
-    answer_id = Column(Integer, ForeignKey("answers.id"), nullable=True)  # Nullable since answers uploaded separately
-    type = Column(SQLEnum(QuestionType), nullable=False, index=True)
+    answer_id = Column(Integer, ForeignKey("answers.id"), nullable=True, index=True)  # Nullable since answers uploaded separately
+    # Stored as VARCHAR + CHECK rather than a Postgres ENUM, so new subjects don't need ALTER TYPE
+    type = Column(
+        SQLEnum(QuestionType, native_enum=False, create_constraint=True, length=32),
+        nullable=False,
+        index=True
+    )
     question_number = Column(Integer, nullable=False, index=True)
     language = Column(String(50), nullable=True)  # Optional field for language of the question
     
     # Relationship to answer
     answer = relationship("AnswerDB", back_populates="questions")
+
+    __table_args__ = (
+        # Serves lookups filtered by type and language, ordered by question number
+        Index("ix_q_type_lang_num", "type", "language", "question_number"),
+    )
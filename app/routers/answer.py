@@ -1,5 +1,6 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 from pathlib import Path
@@ -8,6 +9,7 @@ from app.database import get_db
 from app.models.db_models import AnswerDB, QuestionDB
 # from app.services.pdf_extraction_service import extract_and_save_questions
 from app.models.question import QuestionType
+from app.utils.files import file_response_or_404
 
 
 router = APIRouter(
@@ -23,19 +25,45 @@ def get_answers_count(db: Session = Depends(get_db)):
     Returns:
         A JSON object with the total number of answers.
     """
-    count = db.query(AnswerDB).count()
+    count = db.scalar(select(func.count()).select_from(AnswerDB))
     return {"answers_count": count}
 
-@router.get("")
-def get_all_answers(db: Session = Depends(get_db)):
+@router.get("", response_class=ORJSONResponse)
+def get_all_answers(
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of answers to return"),
+    offset: int = Query(0, ge=0, description="Number of answers to skip"),
+    db: Session = Depends(get_db)
+):
     """
-    Get a list of all answers in the database.
+    Get a page of answers in the database, ordered by ID.
+    
+    Parameters:
+        limit: Maximum number of answers to return (1-1000).
+        offset: Number of answers to skip.
     
     Returns:
-        A JSON array of answer objects.
+        A JSON object with the page of answers under "items" and the
+        offset to request the next page with under "next_offset"
+        (null when this is the last page).
     """
-    answers = db.query(AnswerDB).all()
-    return answers
+    rows = db.execute(
+        select(
+            AnswerDB.id,
+            AnswerDB.path_to_answer,
+            AnswerDB.path_to_explanation,
+            AnswerDB.question_number
+        )
+        .order_by(AnswerDB.id)
+        .limit(limit + 1)  # one extra row tells us whether another page exists
+        .offset(offset)
+    )
+    # Rows are plain JSON-safe dicts, so skip FastAPI's jsonable_encoder pass
+    items = [dict(row._mapping) for row in rows]
+    next_offset = None
+    if len(items) > limit:
+        items.pop()
+        next_offset = offset + limit
+    return ORJSONResponse({"items": items, "next_offset": next_offset})
 
 @router.get("/{answer_id}")
 def get_answer_by_id(answer_id: int, db: Session = Depends(get_db)):
@@ -48,7 +76,7 @@ def get_answer_by_id(answer_id: int, db: Session = Depends(get_db)):
     Returns:
         A JSON object representing the answer, or a 404 error if not found.
     """
-    answer = db.query(AnswerDB).filter(AnswerDB.id == answer_id).first()
+    answer = db.get(AnswerDB, answer_id)
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
     return answer
@@ -64,15 +92,11 @@ def get_answer_image(answer_id: int, db: Session = Depends(get_db)):
     Returns:
         A FileResponse with the image, or a 404 error if not found.
     """
-    answer = db.query(AnswerDB).filter(AnswerDB.id == answer_id).first()
+    answer = db.get(AnswerDB, answer_id)
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
     
-    image_path = Path(answer.path_to_answer)
-    if not image_path.exists():
-        raise HTTPException(status_code=404, detail="Image not found")
-    
-    return FileResponse(image_path)
+    return file_response_or_404(Path(answer.path_to_answer), "Image not found")
 
 @router.get("/{answer_id}/explanation_image")
 def get_explanation_image(answer_id: int, db: Session = Depends(get_db)):
@@ -85,12 +109,13 @@ def get_explanation_image(answer_id: int, db: Session = Depends(get_db)):
     Returns:
         A FileResponse with the explanation image, or a 404 error if not found.
     """
-    answer = db.query(AnswerDB).filter(AnswerDB.id == answer_id).first()
+    answer = db.get(AnswerDB, answer_id)
     if not answer:
         raise HTTPException(status_code=404, detail="Answer not found")
     
-    explanation_image_path = Path(answer.path_to_answer.replace("_answer.png", "_steps.png"))
-    if not explanation_image_path.exists():
+    # NULL means the barem had no steps cell for this exercise; older rows
+    # are backfilled by migrations/001_answers_path_to_explanation.sql
+    if not answer.path_to_explanation:
         raise HTTPException(status_code=404, detail="Explanation image not found")
     
-    return FileResponse(explanation_image_path)
\ No newline at end of file
+    return file_response_or_404(Path(answer.path_to_explanation), "Explanation image not found")
\ No newline at end of file
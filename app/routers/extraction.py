@@ -4,13 +4,16 @@ extraction.py
 Router for PDF extraction endpoints.
 """
 
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
-from typing import Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, Form
+from starlette.concurrency import run_in_threadpool
+from typing import BinaryIO, Callable, Dict, Optional
+from pathlib import Path
+import tempfile
 
-from app.database import get_db
-from app.services.pdf_extraction_math_service import extract_and_save_questions
-from app.services.answer_extraction_math_service import extract_and_save_answers
+from app.config import get_settings
+from app.database import SessionLocal
+from app.services.pdf_extraction_math_service import extract_and_save_questions_from_path
+from app.services.answer_extraction_math_service import extract_and_save_answers_from_path
 from app.models.question import QuestionType
 
 
@@ -19,12 +22,86 @@ router = APIRouter(
     tags=["extraction"]
 )
 
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+PDF_MAGIC = b"%PDF-"
+
+
+def _upload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large (max {max_bytes // (1024 * 1024)} MB)"
+    )
+
+
+def _copy_upload_to_tempfile(src: BinaryIO, max_bytes: int) -> str:
+    """
+    Copy an uploaded PDF into a temporary file and return its path.
+    
+    Blocking file I/O - call it through run_in_threadpool. The upload is
+    copied in chunks so memory use doesn't grow with the file size, and
+    the copy stops with a 413 as soon as max_bytes is exceeded. The caller
+    is responsible for deleting the file.
+    """
+    # Check the PDF signature before copying anything
+    header = src.read(len(PDF_MAGIC))
+    if not header:
+        raise HTTPException(
+            status_code=400,
+            detail="Empty file provided"
+        )
+    if header != PDF_MAGIC:
+        raise HTTPException(
+            status_code=400,
+            detail="File content is not a PDF"
+        )
+    src.seek(0)
+    
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
+        tmp_pdf_path = tmp_pdf.name
+        try:
+            while chunk := src.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _upload_too_large(max_bytes)
+                tmp_pdf.write(chunk)
+        except BaseException:
+            tmp_pdf.close()
+            Path(tmp_pdf_path).unlink(missing_ok=True)
+            raise
+    
+    return tmp_pdf_path
+
+
+async def _save_upload_to_tempfile(file: UploadFile) -> str:
+    """
+    Stream an uploaded PDF into a temporary file and return its path.
+    
+    The copy runs in the threadpool so large uploads don't block the
+    event loop. The caller is responsible for deleting the file.
+    """
+    max_bytes = get_settings().max_upload_mb * 1024 * 1024
+    if file.size is not None and file.size > max_bytes:
+        raise _upload_too_large(max_bytes)
+    
+    return await run_in_threadpool(_copy_upload_to_tempfile, file.file, max_bytes)
+
+
+def _run_with_session(extract: Callable[..., Dict], **kwargs) -> Dict:
+    """
+    Run an extraction function with a database session of its own.
+    
+    Used from the threadpool, so the session is created and closed on the
+    worker thread rather than shared with the request.
+    """
+    with SessionLocal() as db:
+        return extract(db=db, **kwargs)
+
 
 @router.post("/upload-pdf")
 async def upload_and_extract_pdf(
     file: UploadFile = File(..., description="PDF file containing questions"),
-    question_type: Optional[QuestionType] = Form(QuestionType.MATH, description="Type of questions in the PDF"),
-    db: Session = Depends(get_db)
+    question_type: Optional[QuestionType] = Form(QuestionType.MATH, description="Type of questions in the PDF")
 ):
     """
     Upload a PDF file and extract questions from it.
@@ -41,22 +118,21 @@ async def upload_and_extract_pdf(
             detail="Only PDF files are allowed"
         )
     
-    # Read file content
-    pdf_content = await file.read()
-    
-    if len(pdf_content) == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="Empty file provided"
-        )
+    # Stream file content to disk
+    pdf_path = await _save_upload_to_tempfile(file)
     
     # Extract and save questions
-    result = extract_and_save_questions(
-        pdf_content=pdf_content,
-        pdf_filename=file.filename,
-        db=db,
-        question_type=question_type
-    )
+    try:
+        # Extraction is blocking, CPU-bound work; keep it off the event loop
+        result = await run_in_threadpool(
+            _run_with_session,
+            extract_and_save_questions_from_path,
+            pdf_path=pdf_path,
+            pdf_filename=file.filename,
+            question_type=question_type
+        )
+    finally:
+        await run_in_threadpool(Path(pdf_path).unlink, missing_ok=True)
     
     if not result["success"]:
         raise HTTPException(
@@ -80,8 +156,7 @@ def extraction_status():
 
 @router.post("/upload-barem")
 async def upload_and_extract_barem(
-    file: UploadFile = File(..., description="Barem PDF file containing answer keys"),
-    db: Session = Depends(get_db)
+    file: UploadFile = File(..., description="Barem PDF file containing answer keys")
 ):
     """
     Upload a barem (answer key) PDF file and extract answers.
@@ -108,21 +183,20 @@ async def upload_and_extract_barem(
             detail="File must be a barem PDF (filename should contain '_barem')"
         )
     
-    # Read file content
-    pdf_content = await file.read()
-    
-    if len(pdf_content) == 0:
-        raise HTTPException(
-            status_code=400,
-            detail="Empty file provided"
-        )
+    # Stream file content to disk
+    pdf_path = await _save_upload_to_tempfile(file)
     
     # Extract and save answers
-    result = extract_and_save_answers(
-        pdf_content=pdf_content,
-        pdf_filename=file.filename,
-        db=db
-    )
+    try:
+        # Extraction is blocking, CPU-bound work; keep it off the event loop
+        result = await run_in_threadpool(
+            _run_with_session,
+            extract_and_save_answers_from_path,
+            pdf_path=pdf_path,
+            pdf_filename=file.filename
+        )
+    finally:
+        await run_in_threadpool(Path(pdf_path).unlink, missing_ok=True)
     
     if not result["success"]:
         raise HTTPException(
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Form, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from typing import Optional
 from pathlib import Path
@@ -8,6 +9,7 @@ from app.database import get_db
 from app.models.db_models import QuestionDB
 # from app.services.pdf_extraction_service import extract_and_save_questions
 from app.models.question import QuestionType
+from app.utils.files import file_response_or_404
 
 
 router = APIRouter(
@@ -23,19 +25,49 @@ def get_questions_count(db: Session = Depends(get_db)):
     Returns:
         A JSON object with the total number of questions.
     """
-    count = db.query(QuestionDB).count()
+    count = db.scalar(select(func.count()).select_from(QuestionDB))
     return {"questions_count": count}
 
-@router.get("")
-def get_all_questions(db: Session = Depends(get_db)):
+@router.get("", response_class=ORJSONResponse)
+def get_all_questions(
+    after_id: int = Query(0, ge=0, description="Return questions with an ID greater than this"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of questions to return"),
+    db: Session = Depends(get_db)
+):
     """
-    Get a list of all questions in the database.
+    Get a page of questions in the database, ordered by ID.
+    
+    Parameters:
+        after_id: Keyset cursor - pass the last ID of the previous page.
+        limit: Maximum number of questions to return (1-500).
     
     Returns:
-        A JSON array of question objects.
+        A JSON object with the page of questions under "items" and the
+        after_id to request the next page with under "next_cursor"
+        (null when this is the last page).
     """
-    questions = db.query(QuestionDB).all()
-    return questions
+    rows = db.execute(
+        select(
+            QuestionDB.id,
+            QuestionDB.path_to_question,
+            QuestionDB.answer_id,
+            QuestionDB.type,
+            QuestionDB.question_number,
+            QuestionDB.language
+        )
+        .where(QuestionDB.id > after_id)
+        .order_by(QuestionDB.id)
+        .limit(limit + 1)  # one extra row tells us whether another page exists
+    )
+    # Skip FastAPI's jsonable_encoder pass: every column is a plain scalar
+    # except type, a QuestionType member that orjson serialises natively
+    # as its value (e.g. "math")
+    items = [dict(row._mapping) for row in rows]
+    next_cursor = None
+    if len(items) > limit:
+        items.pop()
+        next_cursor = items[-1]["id"]
+    return ORJSONResponse({"items": items, "next_cursor": next_cursor})
 
 @router.get("/{question_id}")
 def get_question_by_id(question_id: int, db: Session = Depends(get_db)):
@@ -48,7 +80,7 @@ def get_question_by_id(question_id: int, db: Session = Depends(get_db)):
     Returns:
         A JSON object representing the question, or a 404 error if not found.
     """
-    question = db.query(QuestionDB).filter(QuestionDB.id == question_id).first()
+    question = db.get(QuestionDB, question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     return question
@@ -65,18 +97,16 @@ def get_question_image(question_id: int, db: Session = Depends(get_db)):
     Returns:
         The image file (PNG format).
     """
-    question = db.query(QuestionDB).filter(QuestionDB.id == question_id).first()
+    question = db.get(QuestionDB, question_id)
     if not question:
         raise HTTPException(status_code=404, detail="Question not found")
     
     # Construct the full path to the image file
     image_path = Path(question.path_to_question)
     
-    if not image_path.exists():
-        raise HTTPException(status_code=404, detail="Image file not found")
-    
-    return FileResponse(
-        path=str(image_path),
+    return file_response_or_404(
+        image_path,
+        "Image file not found",
         media_type="image/png",
         filename=image_path.name
     )
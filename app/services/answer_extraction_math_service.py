@@ -5,21 +5,38 @@ Service for extracting answers from math test barem PDFs using camelot-py.
 Handles multi-row exercises and multi-page spanning with table detection.
 """
 
+import logging
 import re
+from collections import defaultdict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 import tempfile
 
 import camelot
-from pdf2image import convert_from_path
+import pypdfium2 as pdfium
 from PIL import Image
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 
 from app.models.db_models import AnswerDB, QuestionDB
+from app.utils.images import png_writer, stitch_vertically
+from app.utils.pdf import PDFIUM_LOCK, page_size, render_crop
 
 
-RENDER_DPI = 200
+logger = logging.getLogger(__name__)
+
+RENDER_DPI = 150
 EXERCISE_NUM_RE = re.compile(r"^(\d{1,2})([a-z])?[\.\)]")
+ANSWER_HEADER_RE = re.compile(r"răspuns|corect", re.IGNORECASE)
+STEPS_HEADER_RE = re.compile(r"etape|rezolv", re.IGNORECASE)
+
+
+@dataclass(slots=True)
+class ExerciseAgg:
+    """Cells collected for one exercise across all barem tables."""
+    answer_cells: List[tuple] = field(default_factory=list)  # (cell, page_num)
+    steps_cells: List[tuple] = field(default_factory=list)   # (cell, page_num)
+    page: int = 0
 
 
 def _get_test_name_from_barem(barem_filename: str) -> str:
@@ -38,48 +55,93 @@ def _extract_exercise_number(text: str) -> Optional[int]:
     return None
 
 
-def _crop_and_save(
-    page_image: Image.Image,
+def _render_region(
+    pdf: pdfium.PdfDocument,
+    page_num: int,
     bbox: tuple,
-    page_height: float,
-    page_width: float,
-    output_path: Path
-) -> bool:
-    """Crop bbox from page image and save."""
-    try:
-        x1, y1, x2, y2 = bbox
-        img_w, img_h = page_image.size
-        
-        # Scale from PDF points to image pixels
-        scale_x = img_w / page_width
-        scale_y = img_h / page_height
-        
-        # Camelot uses bottom-left origin, image uses top-left
-        # So we need to flip Y
-        x0_px = int(x1 * scale_x)
-        x1_px = int(x2 * scale_x)
-        y0_px = int((page_height - y2) * scale_y)
-        y1_px = int((page_height - y1) * scale_y)
-        
-        # Clamp to bounds
-        x0_px = max(0, min(x0_px, img_w))
-        x1_px = max(0, min(x1_px, img_w))
-        y0_px = max(0, min(y0_px, img_h))
-        y1_px = max(0, min(y1_px, img_h))
-        
-        if x1_px <= x0_px or y1_px <= y0_px:
-            return False
-        
-        if (x1_px - x0_px) < 20 or (y1_px - y0_px) < 10:
-            return False
+    dpi: int
+) -> Optional[Image.Image]:
+    """
+    Render only the bbox region of a page at the given DPI.
+    
+    bbox is (x1, y1, x2, y2) in PDF points with camelot's bottom-left
+    origin. Returns None when the clamped region is too small to be a cell.
+    """
+    scale = dpi / 72
+    page_width, page_height = page_size(pdf, page_num - 1)
+    
+    # Clamp to page bounds
+    x1, y1, x2, y2 = bbox
+    x1 = max(0.0, min(x1, page_width))
+    x2 = max(0.0, min(x2, page_width))
+    y1 = max(0.0, min(y1, page_height))
+    y2 = max(0.0, min(y2, page_height))
+    
+    if (x2 - x1) * scale < 20 or (y2 - y1) * scale < 10:
+        return None
+    
+    return render_crop(
+        pdf,
+        page_num - 1,
+        (x1, y1, page_width - x2, page_height - y2),
+        scale
+    )
+
+
+def _render_cells(
+    pdf: pdfium.PdfDocument,
+    cells: List[tuple],
+    dpi: int
+) -> Optional[Image.Image]:
+    """
+    Render (cell, page_num) pairs into one image.
+    
+    Cells are merged into one bbox per page, and crops from several pages
+    are stitched vertically. Returns None when nothing could be rendered.
+    """
+    if not cells:
+        return None
+    
+    # Group cells by page
+    cells_by_page = defaultdict(list)
+    for cell, page_num in cells:
+        cells_by_page[page_num].append(cell)
+    
+    # Crop from each page
+    page_crops = []
+    for page_num in sorted(cells_by_page):
+        page_cells = cells_by_page[page_num]
         
-        cropped = page_image.crop((x0_px, y0_px, x1_px, y1_px))
-        cropped.save(str(output_path), optimize=True)
-        return True
+        # Merge cells on this page in a single pass
+        first = page_cells[0]
+        x1, y1, x2, y2 = first.x1, first.y1, first.x2, first.y2
+        for c in page_cells[1:]:
+            if c.x1 < x1:
+                x1 = c.x1
+            if c.y1 < y1:
+                y1 = c.y1
+            if c.x2 > x2:
+                x2 = c.x2
+            if c.y2 > y2:
+                y2 = c.y2
+        bbox = (x1, y1, x2, y2)
         
-    except Exception as e:
-        print(f"Crop error: {e}")
-        return False
+        # Render just the merged cell region
+        cropped = _render_region(pdf, page_num, bbox, dpi)
+        if cropped is not None:
+            page_crops.append(cropped)
+    
+    if not page_crops:
+        return None
+    
+    # Stitch pages vertically if needed
+    if len(page_crops) == 1:
+        final_image = page_crops[0]
+    else:
+        final_image = stitch_vertically(page_crops)
+    
+    logger.debug("Rendered %d cells across %d pages", len(cells), len(cells_by_page))
+    return final_image
 
 
 def extract_and_save_answers(
@@ -89,31 +151,53 @@ def extract_and_save_answers(
     output_base_dir: Path = Path("exercises"),
     dpi: int = RENDER_DPI
 ) -> Dict:
-    """Extract answers using camelot-py table detection."""
+    """Extract answers from barem PDF bytes (see extract_and_save_answers_from_path)."""
     
     with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
         tmp_pdf.write(pdf_content)
         tmp_pdf_path = tmp_pdf.name
 
+    try:
+        return extract_and_save_answers_from_path(
+            pdf_path=tmp_pdf_path,
+            pdf_filename=pdf_filename,
+            db=db,
+            output_base_dir=output_base_dir,
+            dpi=dpi
+        )
+    finally:
+        Path(tmp_pdf_path).unlink(missing_ok=True)
+
+
+def extract_and_save_answers_from_path(
+    pdf_path: str,
+    pdf_filename: str,
+    db: Session,
+    output_base_dir: Path = Path("exercises"),
+    dpi: int = RENDER_DPI
+) -> Dict:
+    """Extract answers from a barem PDF on disk using camelot-py table detection."""
+
+    pdf = None
     try:
         test_filename = _get_test_name_from_barem(pdf_filename)
         pdf_stem = Path(test_filename).stem
         output_dir = output_base_dir / pdf_stem
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Render pages to images
-        print(f"Rendering PDF pages to images at {dpi} DPI...")
-        import sys
-        sys.stdout.flush()
-        pages_images = convert_from_path(tmp_pdf_path, dpi=dpi)
-        print(f"Rendered {len(pages_images)} pages")
-        sys.stdout.flush()
+        # Open PDF for rendering; only the cell regions are ever rasterised
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_path)
+            if logger.isEnabledFor(logging.DEBUG):
+                # len() calls into PDFium, so only count pages when logging them
+                logger.debug("Opened PDF with %d pages, rendering cells at %d DPI", len(pdf), dpi)
         
         # Extract tables using camelot (lattice mode for bordered tables)
-        print(f"Extracting tables with camelot...")
-        tables = camelot.read_pdf(tmp_pdf_path, pages='all', flavor='lattice')
+        logger.debug("Extracting tables with camelot...")
+        with PDFIUM_LOCK:
+            tables = camelot.read_pdf(pdf_path, pages='all', flavor='lattice')
         
-        print(f"Found {tables.n} tables across all pages")
+        logger.debug("Found %d tables across all pages", tables.n)
         
         saved_count = 0
         saved_answers = []
@@ -126,22 +210,17 @@ def extract_and_save_answers(
         pending_exercise = None  # Exercise number that continues to next page
         
         # Collect all exercise data across all tables first
-        all_exercises = {}  # ex_num -> {"answer_cells": [], "steps_cells": [], "page": int}
+        all_exercises: Dict[int, ExerciseAgg] = {}
         
         for table_idx, table in enumerate(tables):
             df = table.df  # Get pandas DataFrame
             page_num = table.page
             
-            print(f"\n=== Table {table_idx + 1} (Page {page_num}) ===")
-            print(f"Shape: {df.shape} (rows x cols)")
-            print(f"Columns: {list(df.columns)}")
+            logger.debug("Table %d (page %d): shape %s", table_idx + 1, page_num, df.shape)
             
-            # Display first few rows for debugging
-            try:
-                print("First 3 rows:")
-                print(df.head(3))
-            except UnicodeEncodeError:
-                print("First 3 rows: (Unicode display error)")
+            # Display first few rows for debugging (formatting a DataFrame isn't free)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("First 3 rows:\n%s", df.head(3))
             
             # Find column indices for answer and steps
             header_row = df.iloc[0]  # First row is usually header
@@ -149,26 +228,26 @@ def extract_and_save_answers(
             steps_col = None
             
             for col_idx, cell_text in enumerate(header_row):
-                cell_lower = str(cell_text).lower()
-                if 'răspuns' in cell_lower or 'corect' in cell_lower:
+                cell_text = str(cell_text)
+                if ANSWER_HEADER_RE.search(cell_text):
                     answer_col = col_idx
-                    print(f"Found answer column: {col_idx}")
-                if 'etape' in cell_lower or 'rezolv' in cell_lower:
+                    logger.debug("Found answer column: %d", col_idx)
+                if STEPS_HEADER_RE.search(cell_text):
                     steps_col = col_idx
-                    print(f"Found steps column: {col_idx}")
+                    logger.debug("Found steps column: %d", col_idx)
             
             # If no columns found but we have previous columns, check if table structure matches
             if answer_col is None and steps_col is None and (last_answer_col is not None or last_steps_col is not None):
                 # This might be a continuation page - check if column count matches
                 if last_answer_col is not None and last_answer_col < len(header_row):
                     answer_col = last_answer_col
-                    print(f"Using previous answer column: {answer_col} (continuation page)")
+                    logger.debug("Using previous answer column: %d (continuation page)", answer_col)
                 if last_steps_col is not None and last_steps_col < len(header_row):
                     steps_col = last_steps_col
-                    print(f"Using previous steps column: {steps_col} (continuation page)")
+                    logger.debug("Using previous steps column: %d (continuation page)", steps_col)
             
             if answer_col is None and steps_col is None:
-                print("Could not identify answer/steps columns")
+                logger.debug("Could not identify answer/steps columns")
                 continue
             
             # Save column indices for next table (continuation pages)
@@ -177,12 +256,6 @@ def extract_and_save_answers(
             if steps_col is not None:
                 last_steps_col = steps_col
             
-            # Get page dimensions from camelot
-            page_width, page_height = table.pdf_size if hasattr(table, 'pdf_size') else (595.32, 841.92)
-            
-            # Get page image
-            page_image = pages_images[page_num - 1]  # 0-indexed
-            
             # Group rows by exercise (handle multi-row exercises)
             exercise_rows = {}  # ex_num -> list of row indices
             current_ex = None
@@ -191,19 +264,19 @@ def extract_and_save_answers(
             if pending_exercise is not None:
                 current_ex = pending_exercise
                 exercise_rows[current_ex] = []
-                print(f"  Continuing exercise {current_ex} from previous page")
+                logger.debug("Continuing exercise %d from previous page", current_ex)
             
             # For continuation pages, start from row 0 (no header row)
             # For first page, skip row 0 (it has headers)
             start_row = 0 if (answer_col == last_answer_col and steps_col == last_steps_col and table_idx > 0) else 1
             
+            # Pull the first column out once instead of an .iloc lookup per row
+            first_col = df.iloc[:, 0].astype(str).str.strip().tolist()
+            
             # Process data rows
-            for row_idx in range(start_row, len(df)):
-                row = df.iloc[row_idx]
-                
+            for row_idx in range(start_row, len(first_col)):
                 # Get exercise number from first cell
-                first_cell = str(row.iloc[0]).strip()
-                ex_num = _extract_exercise_number(first_cell)
+                ex_num = _extract_exercise_number(first_col[row_idx])
                 
                 if ex_num is not None:
                     # Start of new exercise
@@ -222,165 +295,64 @@ def extract_and_save_answers(
             else:
                 pending_exercise = None
             
-            print(f"  Found exercises: {list(exercise_rows.keys())}")
+            logger.debug("Found exercises: %s", list(exercise_rows))
             
             # Collect cells for each exercise in this table
+            table_cells = table.cells
+            n_rows = len(table_cells)
             for ex_num, row_indices in exercise_rows.items():
                 # Initialize exercise data if not exists
-                if ex_num not in all_exercises:
-                    all_exercises[ex_num] = {
-                        "answer_cells": [],
-                        "steps_cells": [],
-                        "page": page_num
-                    }
-                
-                # Collect answer cells
-                if answer_col is not None:
-                    for row_idx in row_indices:
-                        if row_idx < len(table.cells) and answer_col < len(table.cells[row_idx]):
-                            cell = table.cells[row_idx][answer_col]
-                            all_exercises[ex_num]["answer_cells"].append((cell, page_num, page_width, page_height))
+                data = all_exercises.get(ex_num)
+                if data is None:
+                    data = all_exercises[ex_num] = ExerciseAgg(page=page_num)
                 
-                # Collect steps cells
-                if steps_col is not None:
-                    for row_idx in row_indices:
-                        if row_idx < len(table.cells) and steps_col < len(table.cells[row_idx]):
-                            cell = table.cells[row_idx][steps_col]
-                            all_exercises[ex_num]["steps_cells"].append((cell, page_num, page_width, page_height))
+                # Collect answer and steps cells in one pass over the rows
+                for row_idx in row_indices:
+                    if row_idx >= n_rows:
+                        continue
+                    row_cells = table_cells[row_idx]
+                    if answer_col is not None and answer_col < len(row_cells):
+                        data.answer_cells.append((row_cells[answer_col], page_num))
+                    if steps_col is not None and steps_col < len(row_cells):
+                        data.steps_cells.append((row_cells[steps_col], page_num))
         
         # Now process all collected exercises
-        print(f"\nProcessing {len(all_exercises)} exercises...")
+        logger.debug("Processing %d exercises...", len(all_exercises))
         
-        for ex_num in sorted(all_exercises.keys()):
-            data = all_exercises[ex_num]
-            print(f"  Exercise {ex_num} (page {data['page']})")
-            
-            answer_saved = False
-            steps_saved = False
-            
-            # Process answer cells
-            if data["answer_cells"]:
-                # Group cells by page
-                cells_by_page = {}
-                for cell, page_num, pw, ph in data["answer_cells"]:
-                    if page_num not in cells_by_page:
-                        cells_by_page[page_num] = {"cells": [], "pw": pw, "ph": ph}
-                    cells_by_page[page_num]["cells"].append(cell)
+        # Load this test's questions (and their current answers) in one go
+        # instead of a LIKE query per exercise
+        test_questions = (
+            db.query(QuestionDB)
+            .options(selectinload(QuestionDB.answer))
+            .filter(QuestionDB.path_to_question.like(f"%{pdf_stem}%"))
+            .order_by(QuestionDB.id)
+            .all()
+        )
+        questions_by_num = {}
+        for q in test_questions:
+            questions_by_num.setdefault(q.question_number, q)
+        
+        # Crops render on this thread; their PNGs are written in the background
+        new_answers = []
+        with png_writer() as save_image:
+            for ex_num, data in sorted(all_exercises.items()):
+                logger.debug("Exercise %d (page %d)", ex_num, data.page)
                 
-                # Crop from each page and stitch vertically if multi-page
-                page_crops = []
-                for page_num in sorted(cells_by_page.keys()):
-                    cells = cells_by_page[page_num]["cells"]
-                    pw = cells_by_page[page_num]["pw"]
-                    ph = cells_by_page[page_num]["ph"]
-                    
-                    # Merge cells on this page
-                    x1 = min(c.x1 for c in cells)
-                    y1 = min(c.y1 for c in cells)
-                    x2 = max(c.x2 for c in cells)
-                    y2 = max(c.y2 for c in cells)
-                    bbox = (x1, y1, x2, y2)
-                    
-                    # Crop from page
-                    page_image = pages_images[page_num - 1]
-                    img_w, img_h = page_image.size
-                    scale_x = img_w / pw
-                    scale_y = img_h / ph
-                    
-                    x0_px = int(x1 * scale_x)
-                    x1_px = int(x2 * scale_x)
-                    y0_px = int((ph - y2) * scale_y)
-                    y1_px = int((ph - y1) * scale_y)
-                    
-                    x0_px = max(0, min(x0_px, img_w))
-                    x1_px = max(0, min(x1_px, img_w))
-                    y0_px = max(0, min(y0_px, img_h))
-                    y1_px = max(0, min(y1_px, img_h))
-                    
-                    if x1_px > x0_px and y1_px > y0_px and (x1_px - x0_px) >= 20 and (y1_px - y0_px) >= 10:
-                        cropped = page_image.crop((x0_px, y0_px, x1_px, y1_px))
-                        page_crops.append(cropped)
+                answer_image = _render_cells(pdf, data.answer_cells, dpi)
+                steps_image = _render_cells(pdf, data.steps_cells, dpi)
+                answer_saved = answer_image is not None
+                steps_saved = steps_image is not None
                 
-                # Stitch pages vertically if needed
-                if page_crops:
-                    if len(page_crops) == 1:
-                        final_image = page_crops[0]
-                    else:
-                        # Stitch vertically
-                        total_height = sum(img.height for img in page_crops)
-                        max_width = max(img.width for img in page_crops)
-                        final_image = Image.new('RGB', (max_width, total_height), 'white')
-                        y_offset = 0
-                        for crop in page_crops:
-                            final_image.paste(crop, (0, y_offset))
-                            y_offset += crop.height
-                    
+                if answer_saved:
                     answer_path = output_dir / f"exercise_{ex_num:02d}_answer.png"
-                    final_image.save(str(answer_path), optimize=True)
-                    answer_saved = True
-                    print(f"    Answer: True ({sum(len(cells_by_page[p]['cells']) for p in cells_by_page)} cells across {len(cells_by_page)} pages)")
-            
-            # Process steps cells (same logic)
-            if data["steps_cells"]:
-                cells_by_page = {}
-                for cell, page_num, pw, ph in data["steps_cells"]:
-                    if page_num not in cells_by_page:
-                        cells_by_page[page_num] = {"cells": [], "pw": pw, "ph": ph}
-                    cells_by_page[page_num]["cells"].append(cell)
-                
-                page_crops = []
-                for page_num in sorted(cells_by_page.keys()):
-                    cells = cells_by_page[page_num]["cells"]
-                    pw = cells_by_page[page_num]["pw"]
-                    ph = cells_by_page[page_num]["ph"]
-                    
-                    x1 = min(c.x1 for c in cells)
-                    y1 = min(c.y1 for c in cells)
-                    x2 = max(c.x2 for c in cells)
-                    y2 = max(c.y2 for c in cells)
-                    bbox = (x1, y1, x2, y2)
-                    
-                    page_image = pages_images[page_num - 1]
-                    img_w, img_h = page_image.size
-                    scale_x = img_w / pw
-                    scale_y = img_h / ph
-                    
-                    x0_px = int(x1 * scale_x)
-                    x1_px = int(x2 * scale_x)
-                    y0_px = int((ph - y2) * scale_y)
-                    y1_px = int((ph - y1) * scale_y)
-                    
-                    x0_px = max(0, min(x0_px, img_w))
-                    x1_px = max(0, min(x1_px, img_w))
-                    y0_px = max(0, min(y0_px, img_h))
-                    y1_px = max(0, min(y1_px, img_h))
-                    
-                    if x1_px > x0_px and y1_px > y0_px and (x1_px - x0_px) >= 20 and (y1_px - y0_px) >= 10:
-                        cropped = page_image.crop((x0_px, y0_px, x1_px, y1_px))
-                        page_crops.append(cropped)
-                
-                if page_crops:
-                    if len(page_crops) == 1:
-                        final_image = page_crops[0]
-                    else:
-                        total_height = sum(img.height for img in page_crops)
-                        max_width = max(img.width for img in page_crops)
-                        final_image = Image.new('RGB', (max_width, total_height), 'white')
-                        y_offset = 0
-                        for crop in page_crops:
-                            final_image.paste(crop, (0, y_offset))
-                            y_offset += crop.height
-                    
+                    save_image(answer_image, answer_path)
+                if steps_saved:
                     steps_path = output_dir / f"exercise_{ex_num:02d}_steps.png"
-                    final_image.save(str(steps_path), optimize=True)
-                    steps_saved = True
-                    print(f"    Steps: True ({sum(len(cells_by_page[p]['cells']) for p in cells_by_page)} cells across {len(cells_by_page)} pages)")
+                    save_image(steps_image, steps_path)
                 
                 if not (answer_saved or steps_saved):
                     continue
                 
-                print(f"    Saving to database...")
-                
                 # Save to database
                 answer_rel_path = None
                 steps_rel_path = None
@@ -393,56 +365,48 @@ def extract_and_save_answers(
                 primary_path = answer_rel_path if answer_rel_path else steps_rel_path
                 
                 # Find the question for this exercise from THIS specific test
-                # Match by question_number AND path containing the test directory
-                question = db.query(QuestionDB).filter(
-                    QuestionDB.question_number == ex_num,
-                    QuestionDB.path_to_question.like(f"%{pdf_stem}%")
-                ).first()
+                question = questions_by_num.get(ex_num)
                 
                 if question:
                     # Check if this question already has an answer
                     if question.answer_id:
                         # Update existing answer
-                        existing_answer = db.query(AnswerDB).filter(AnswerDB.id == question.answer_id).first()
+                        existing_answer = question.answer
                         if existing_answer:
                             existing_answer.path_to_answer = primary_path
+                            existing_answer.path_to_explanation = steps_rel_path
                             existing_answer.question_number = ex_num
                             answer_id = existing_answer.id
-                            print(f"    Updated existing answer (id={answer_id})")
+                            logger.debug("Updated existing answer (id=%d)", answer_id)
                         else:
                             # Answer ID exists but answer not found, create new
-                            answer = AnswerDB(path_to_answer=primary_path, question_number=ex_num)
-                            db.add(answer)
-                            db.flush()
-                            answer_id = answer.id
-                            question.answer_id = answer_id
-                            print(f"    Created new answer (id={answer_id})")
+                            answer = AnswerDB(path_to_answer=primary_path, path_to_explanation=steps_rel_path, question_number=ex_num)
+                            new_answers.append(answer)
+                            question.answer = answer
+                            logger.debug("Created new answer for exercise %d", ex_num)
                     else:
                         # Create new answer for this question
-                        answer = AnswerDB(path_to_answer=primary_path, question_number=ex_num)
-                        db.add(answer)
-                        db.flush()
-                        answer_id = answer.id
-                        question.answer_id = answer_id
-                        print(f"    Created new answer and linked to question (id={answer_id})")
+                        answer = AnswerDB(path_to_answer=primary_path, path_to_explanation=steps_rel_path, question_number=ex_num)
+                        new_answers.append(answer)
+                        question.answer = answer
+                        logger.debug("Created new answer and linked to question %d", question.id)
                 else:
                     # No matching question found - create orphan answer
-                    answer = AnswerDB(path_to_answer=primary_path, question_number=ex_num)
-                    db.add(answer)
-                    db.flush()
-                    answer_id = answer.id
-                    print(f"    Warning: No question found for exercise {ex_num} in {pdf_stem}, created orphan answer (id={answer_id})")
+                    answer = AnswerDB(path_to_answer=primary_path, path_to_explanation=steps_rel_path, question_number=ex_num)
+                    new_answers.append(answer)
+                    logger.warning("No question found for exercise %d in %s, created orphan answer", ex_num, pdf_stem)
                 
                 saved_count += 1
                 saved_answers.append({
                     "exercise_number": ex_num,
                     "answer_path": answer_rel_path,
                     "steps_path": steps_rel_path,
-                    "page": page_num
+                    "page": data.page
                 })
-                
-                print(f"    Total saved so far: {saved_count}")
 
+        # Insert all new answers at once; the unit of work fills in
+        # questions.answer_id from the answer relationships on flush
+        db.add_all(new_answers)
         db.commit()
 
         return {
@@ -456,12 +420,13 @@ def extract_and_save_answers(
 
     except Exception as e:
         db.rollback()
-        import traceback
-        traceback.print_exc()
+        logger.exception("Answer extraction failed for %s", pdf_filename)
         return {
             "success": False,
             "message": f"Error: {str(e)}",
             "answers_saved": 0
         }
     finally:
-        Path(tmp_pdf_path).unlink(missing_ok=True)
+        if pdf is not None:
+            with PDFIUM_LOCK:
+                pdf.close()
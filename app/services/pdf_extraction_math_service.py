@@ -5,18 +5,22 @@ Service for extracting exercises from structured math test PDFs.
 Handles exercises with sub-points and multi-page continuations.
 """
 
+import io
 import re
+from operator import itemgetter
 from pathlib import Path
-from typing import List, Dict, Optional
-import tempfile
+from typing import List, Dict, Optional, Union
 
 import pdfplumber
-from pdf2image import convert_from_path
+import pypdfium2 as pdfium
 from PIL import Image
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from app.models.db_models import QuestionDB
 from app.models.question import QuestionType
+from app.utils.images import png_writer, stitch_vertically
+from app.utils.pdf import PDFIUM_LOCK, render_crop
 
 
 # ─── Configuration ────────────────────────────────────────────────────────────
@@ -29,9 +33,12 @@ STITCH_BG = (255, 255, 255)
 STITCH_SEP_PX = 2
 STITCH_SEP_COLOR = (200, 200, 200)
 
-EXERCISE_NUM_RE = re.compile(r"^(\d{1,2})\.$")
 SUBPOINT_RE = re.compile(r"^[a-z]\)$")
-LANGUAGE_RE = re.compile(r"(?:^|[_\-\.\s])(ro|ru|en)(?:[_\-\.\s]|$)", re.IGNORECASE)
+LANGUAGE_CODES = frozenset({"ro", "ru", "en"})
+FILENAME_TOKEN_SPLIT_RE = re.compile(r"[_\-\.\s]+")
+
+# Pulls (x0, text, top) out of a pdfplumber word dict in one C-level call
+WORD_FIELDS = itemgetter("x0", "text", "top")
 
 
 # ─── Helper Functions ─────────────────────────────────────────────────────────
@@ -68,10 +75,6 @@ def _extend_to_page(ex: dict, page_idx: int, page_h: float, page_w: float) -> No
     )
 
 
-def _pt_to_px(pt: float, page_h_pt: float, img_h_px: int) -> int:
-    return int(pt * img_h_px / page_h_pt)
-
-
 def extract_language_from_filename(filename: str) -> Optional[str]:
     """
     Extract language code from PDF filename.
@@ -79,24 +82,28 @@ def extract_language_from_filename(filename: str) -> Optional[str]:
     underscores, hyphens, dots, spaces, or at the start/end of the stem.
     Returns the lowercase language code, or None if not found.
     """
-    stem = Path(filename).stem
-    match = LANGUAGE_RE.search(stem)
-    if match:
-        return match.group(1).lower()
+    stem = Path(filename).stem.lower()
+    for token in FILENAME_TOKEN_SPLIT_RE.split(stem):
+        if token in LANGUAGE_CODES:
+            return token
     return None
 
 
 # ─── Core Extraction Functions ────────────────────────────────────────────────
 
-def find_exercise_boundaries(pdf_path: str) -> List[dict]:
+def find_exercise_boundaries(pdf_source: Union[str, bytes]) -> List[dict]:
     """
     Scan every page and return a list of exercise dicts.
+    pdf_source is a path to the PDF or its raw bytes.
     """
     exercises: List[dict] = []
     open_ex: Optional[dict] = None
     last_num: int = 0
 
-    with pdfplumber.open(pdf_path) as pdf:
+    if isinstance(pdf_source, bytes):
+        pdf_source = io.BytesIO(pdf_source)
+
+    with pdfplumber.open(pdf_source) as pdf:
         for page_idx, page in enumerate(pdf.pages):
             page_h = page.height
             page_w = page.width
@@ -114,14 +121,20 @@ def find_exercise_boundaries(pdf_path: str) -> List[dict]:
                 if last_span["page"] < page_idx:
                     _extend_to_page(open_ex, page_idx, page_h, page_w)
 
-            for word in words:
-                text = word["text"].strip()
-                y = word["top"]
-                x = word["x0"]
-
-                m = EXERCISE_NUM_RE.match(text)
-                if m and x < left_limit:
-                    num = int(m.group(1))
+            for x, text, y in map(WORD_FIELDS, words):
+                # Exercise numbers sit in the left margin; one float compare
+                # skips the body text before any string work
+                if x >= left_limit:
+                    continue
+
+                # They look like "7." or "12."; a few cheap string checks
+                # reject almost every other margin word
+                text = text.strip()
+                if len(text) > 3 or not text.endswith("."):
+                    continue
+                head = text[:-1]
+                if head.isdecimal():
+                    num = int(head)
 
                     if num == last_num + 1:
                         if open_ex is not None:
@@ -144,50 +157,45 @@ def find_exercise_boundaries(pdf_path: str) -> List[dict]:
     return exercises
 
 
-def render_exercise(exercise: dict, pages_images: List[Image.Image]) -> Optional[Image.Image]:
+def render_exercise(
+    exercise: dict,
+    pdf: pdfium.PdfDocument,
+    dpi: int = RENDER_DPI
+) -> Optional[Image.Image]:
     """
-    Build a single PIL Image for the exercise by cropping and stitching.
+    Build a single PIL Image for the exercise by rendering and stitching
+    only the page bands its spans cover.
     """
     slices: List[Image.Image] = []
 
     for span in exercise["spans"]:
-        page_img = pages_images[span["page"]]
-        img_w, img_h = page_img.size
         page_h_pt = span["page_height"]
 
         y_top_pt = max(0.0, span["y_top"] - PADDING_TOP)
         y_bot_pt = min(page_h_pt, span["y_bottom"] + PADDING_BOTTOM)
 
-        y_top_px = max(0, _pt_to_px(y_top_pt, page_h_pt, img_h))
-        y_bot_px = min(img_h, _pt_to_px(y_bot_pt, page_h_pt, img_h))
-
-        if y_bot_px - y_top_px < 4:
+        if (y_bot_pt - y_top_pt) * dpi / 72 < 4:
             continue
 
-        slices.append(page_img.crop((0, y_top_px, img_w, y_bot_px)))
+        # Full-width band: cut only the top and bottom margins (y is top-origin)
+        slices.append(render_crop(
+            pdf,
+            span["page"],
+            (0, max(0.0, page_h_pt - y_bot_pt), 0, y_top_pt),
+            dpi / 72
+        ))
 
     if not slices:
         return None
     if len(slices) == 1:
         return slices[0]
 
-    total_w = max(s.width for s in slices)
-    sep_h = STITCH_SEP_PX
-    total_h = sum(s.height for s in slices) + sep_h * (len(slices) - 1)
-
-    canvas = Image.new("RGB", (total_w, total_h), STITCH_BG)
-    y_cursor = 0
-
-    for i, sl in enumerate(slices):
-        canvas.paste(sl, (0, y_cursor))
-        y_cursor += sl.height
-
-        if i < len(slices) - 1 and sep_h > 0:
-            sep_strip = Image.new("RGB", (total_w, sep_h), STITCH_SEP_COLOR)
-            canvas.paste(sep_strip, (0, y_cursor))
-            y_cursor += sep_h
-
-    return canvas
+    return stitch_vertically(
+        slices,
+        background=STITCH_BG,
+        separator_px=STITCH_SEP_PX,
+        separator_color=STITCH_SEP_COLOR
+    )
 
 
 # ─── Main Service Function ────────────────────────────────────────────────────
@@ -198,30 +206,77 @@ def extract_and_save_questions(
     db: Session,
     output_base_dir: Path = Path("exercises"),
     question_type: QuestionType = QuestionType.MATH,
-    dpi: int = RENDER_DPI
+    dpi: int = RENDER_DPI,
+    optimize_png: bool = False
 ) -> Dict[str, any]:
     """
-    Extract questions from PDF and save to database.
+    Extract questions from PDF bytes and save to database.
+    
+    The bytes are parsed in memory by both pdfplumber and PDFium, so
+    nothing is written to disk besides the exercise images.
+    
+    Returns:
+        Dict with extraction results
+    """
+    return _extract_and_save_questions(
+        pdf_source=pdf_content,
+        pdf_filename=pdf_filename,
+        db=db,
+        output_base_dir=output_base_dir,
+        question_type=question_type,
+        dpi=dpi,
+        optimize_png=optimize_png
+    )
+
+
+def extract_and_save_questions_from_path(
+    pdf_path: str,
+    pdf_filename: str,
+    db: Session,
+    output_base_dir: Path = Path("exercises"),
+    question_type: QuestionType = QuestionType.MATH,
+    dpi: int = RENDER_DPI,
+    optimize_png: bool = False
+) -> Dict[str, any]:
+    """
+    Extract questions from a PDF on disk and save to database.
     
     Args:
-        pdf_content: PDF file content as bytes
+        pdf_path: Path to the PDF file
         pdf_filename: Original filename
         db: Database session
         output_base_dir: Base directory for saving extracted images
         question_type: Type of questions (default: MATH)
         dpi: Resolution for rendering
+        optimize_png: Spend extra encode time for smaller PNGs
     
     Returns:
         Dict with extraction results
     """
+    return _extract_and_save_questions(
+        pdf_source=pdf_path,
+        pdf_filename=pdf_filename,
+        db=db,
+        output_base_dir=output_base_dir,
+        question_type=question_type,
+        dpi=dpi,
+        optimize_png=optimize_png
+    )
+
+
+def _extract_and_save_questions(
+    pdf_source: Union[str, bytes],
+    pdf_filename: str,
+    db: Session,
+    output_base_dir: Path,
+    question_type: QuestionType,
+    dpi: int,
+    optimize_png: bool
+) -> Dict[str, any]:
     # Detect language from filename
     language = extract_language_from_filename(pdf_filename)
 
-    # Create temporary PDF file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_pdf:
-        tmp_pdf.write(pdf_content)
-        tmp_pdf_path = tmp_pdf.name
-
+    pdf = None
     try:
         # Create output directory
         pdf_stem = Path(pdf_filename).stem
@@ -229,7 +284,7 @@ def extract_and_save_questions(
         output_dir.mkdir(parents=True, exist_ok=True)
 
         # Find exercise boundaries
-        exercises = find_exercise_boundaries(tmp_pdf_path)
+        exercises = find_exercise_boundaries(pdf_source)
         
         if not exercises:
             return {
@@ -238,41 +293,46 @@ def extract_and_save_questions(
                 "questions_saved": 0
             }
 
-        # Render PDF pages
-        pages_images = convert_from_path(tmp_pdf_path, dpi=dpi)
+        # Open PDF for rendering; only the exercise bands are ever rasterised
+        with PDFIUM_LOCK:
+            pdf = pdfium.PdfDocument(pdf_source)
 
         # Extract and save each exercise
         saved_count = 0
         saved_questions = []
-
-        for ex in exercises:
-            img = render_exercise(ex, pages_images)
-            if img is None:
-                continue
-
-            # Save image
-            img_filename = f"exercise_{ex['number']:02d}.png"
-            img_path = output_dir / img_filename
-            img.save(str(img_path), optimize=True)
-
-            # Create relative path for database storage
-            relative_path = f"{output_dir.relative_to(output_base_dir.parent)}/{img_filename}".replace("\\", "/")
-
-            # Save to database
-            question = QuestionDB(
-                path_to_question=relative_path,
-                answer_id=None,  # No answer yet - can be updated later
-                type=question_type,
-                question_number=ex['number'],
-                language=language
-            )
-            db.add(question)
-            saved_count += 1
-            saved_questions.append({
-                "number": ex['number'],
-                "path": relative_path
-            })
-
+        question_rows = []
+
+        # Images are written in the background; leaving the block waits for them
+        with png_writer() as save_image:
+            for ex in exercises:
+                img = render_exercise(ex, pdf, dpi)
+                if img is None:
+                    continue
+
+                img_filename = f"exercise_{ex['number']:02d}.png"
+                img_path = output_dir / img_filename
+                save_image(img, img_path, optimize_png)
+
+                # Create relative path for database storage
+                relative_path = f"{output_dir.relative_to(output_base_dir.parent)}/{img_filename}".replace("\\", "/")
+
+                # Queue row for a single bulk insert
+                question_rows.append({
+                    "path_to_question": relative_path,
+                    "answer_id": None,  # No answer yet - can be updated later
+                    "type": question_type,
+                    "question_number": ex['number'],
+                    "language": language
+                })
+                saved_count += 1
+                saved_questions.append({
+                    "number": ex['number'],
+                    "path": relative_path
+                })
+
+        # Save to database in one multi-row INSERT
+        if question_rows:
+            db.execute(insert(QuestionDB), question_rows)
         db.commit()
 
         return {
@@ -291,5 +351,6 @@ def extract_and_save_questions(
             "questions_saved": 0
         }
     finally:
-        # Clean up temporary PDF
-        Path(tmp_pdf_path).unlink(missing_ok=True)
+        if pdf is not None:
+            with PDFIUM_LOCK:
+                pdf.close()
@@ -0,0 +1,69 @@
+"""
+files.py
+--------
+Helpers for serving extracted images from disk.
+"""
+
+import os
+import stat
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from fastapi import HTTPException, Response
+from fastapi.responses import FileResponse
+
+from app.config import get_settings
+
+
+def file_response_or_404(
+    path: Path,
+    detail: str,
+    media_type: Optional[str] = None,
+    filename: Optional[str] = None
+) -> Response:
+    """
+    Build a response serving the file at path, or raise a 404 with detail.
+    
+    With X_ACCEL_REDIRECT_PREFIX configured, the reverse proxy is told to
+    send the file itself (and answers 404 if it's missing). Otherwise the
+    file is stat'ed once here and the result is handed to FileResponse,
+    which would otherwise stat the same path again before sending.
+    """
+    prefix = get_settings().x_accel_redirect_prefix
+    if prefix:
+        return _accel_redirect_response(prefix, path, media_type, filename)
+    
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        raise HTTPException(status_code=404, detail=detail)
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail=detail)
+    
+    return FileResponse(
+        path=path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=stat_result
+    )
+
+
+def _accel_redirect_response(
+    prefix: str,
+    path: Path,
+    media_type: Optional[str],
+    filename: Optional[str]
+) -> Response:
+    """Build an empty response that hands the file off to nginx."""
+    headers = {
+        "X-Accel-Redirect": f"{prefix.rstrip('/')}/{quote(path.as_posix().lstrip('/'))}"
+    }
+    if filename:
+        quoted_filename = quote(filename)
+        if quoted_filename != filename:
+            headers["Content-Disposition"] = f"attachment; filename*=utf-8''{quoted_filename}"
+        else:
+            headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    
+    return Response(headers=headers, media_type=media_type)
@@ -0,0 +1,92 @@
+"""
+images.py
+---------
+Helpers for stitching and writing extracted exercise images.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+
+# zlib level 1: these crops are mostly flat white with text, so higher
+# levels (and optimize=True's extra passes) cost several times the CPU for
+# a few percent smaller files
+PNG_COMPRESS_LEVEL = 1
+
+# Threads used by png_writer. Encoding releases the GIL, so a few workers
+# keep up with rendering without oversubscribing the request threadpool
+SAVE_WORKERS = min(4, os.cpu_count() or 1)
+
+
+def save_png(image: Image.Image, path: Path, optimize: bool = False) -> None:
+    """
+    Write image to path as a PNG using fast compression.
+    
+    optimize=True trades encode time for size (max zlib effort plus
+    PIL's extra optimisation pass).
+    """
+    if optimize:
+        image.save(str(path), format="PNG", optimize=True)
+    else:
+        image.save(str(path), format="PNG", compress_level=PNG_COMPRESS_LEVEL)
+
+
+@contextmanager
+def png_writer(
+    max_workers: int = SAVE_WORKERS
+) -> Iterator[Callable[..., None]]:
+    """
+    Yield a save(image, path, optimize=False) function that queues
+    save_png calls on a small thread pool.
+    
+    The caller keeps rendering while earlier images are encoded. Leaving
+    the block waits for every write and re-raises the first failure, so
+    nothing should be committed that points at an unwritten file.
+    """
+    futures = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def save(image: Image.Image, path: Path, optimize: bool = False) -> None:
+            futures.append(pool.submit(save_png, image, path, optimize))
+        
+        yield save
+        
+        for future in futures:
+            future.result()
+
+
+def stitch_vertically(
+    images: Sequence[Image.Image],
+    background: Tuple[int, int, int] = (255, 255, 255),
+    separator_px: int = 0,
+    separator_color: Tuple[int, int, int] = (255, 255, 255)
+) -> Image.Image:
+    """
+    Stack images top to bottom into a single RGB image.
+    
+    Narrower images are left-aligned on the background colour, with an
+    optional separator strip between consecutive images. The canvas is
+    allocated once and each image is copied in with one slice assignment.
+    """
+    arrays = [
+        np.asarray(img if img.mode == "RGB" else img.convert("RGB"))
+        for img in images
+    ]
+    width = max(arr.shape[1] for arr in arrays)
+    height = sum(arr.shape[0] for arr in arrays) + separator_px * (len(arrays) - 1)
+    
+    canvas = np.full((height, width, 3), background, dtype=np.uint8)
+    y = 0
+    for i, arr in enumerate(arrays):
+        canvas[y:y + arr.shape[0], :arr.shape[1]] = arr
+        y += arr.shape[0]
+        if separator_px and i < len(arrays) - 1:
+            canvas[y:y + separator_px] = separator_color
+            y += separator_px
+    
+    return Image.fromarray(canvas)
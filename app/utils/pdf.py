@@ -0,0 +1,45 @@
+"""
+pdf.py
+------
+Shared helpers for working with PDFium (pypdfium2).
+"""
+
+import threading
+from typing import Tuple
+
+import pypdfium2 as pdfium
+from PIL import Image
+
+
+# PDFium is not thread-safe - not even across separate documents - and
+# extractions run concurrently in the request threadpool. Hold this lock
+# around every call into pypdfium2, including indirect ones (camelot's
+# lattice flavor rasterises pages through pypdfium2 as well).
+PDFIUM_LOCK = threading.RLock()
+
+
+def page_size(pdf: pdfium.PdfDocument, page_idx: int) -> Tuple[float, float]:
+    """Return (width, height) in PDF points of the 0-based page page_idx."""
+    with PDFIUM_LOCK:
+        return pdf.get_page_size(page_idx)
+
+
+def render_crop(
+    pdf: pdfium.PdfDocument,
+    page_idx: int,
+    crop: Tuple[float, float, float, float],
+    scale: float
+) -> Image.Image:
+    """
+    Render part of the 0-based page page_idx to a PIL image.
+    
+    crop is the margin, in PDF points, cut from each edge of the page:
+    (left, bottom, right, top). Only the remaining region is rasterised.
+    """
+    with PDFIUM_LOCK:
+        page = pdf[page_idx]
+        try:
+            bitmap = page.render(scale=scale, crop=crop)
+            return bitmap.to_pil()
+        finally:
+            page.close()
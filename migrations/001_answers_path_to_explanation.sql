@@ -0,0 +1,18 @@
+-- Adds answers.path_to_explanation and backfills it for existing rows.
+--
+-- init_db's create_all only creates missing tables, so databases created
+-- before this column existed need this run once:
+--   psql "$DATABASE_URL" -f migrations/001_answers_path_to_explanation.sql
+--
+-- The backfill applies the old naming convention one last time; the API
+-- now reads the column directly and treats NULL as "no steps image".
+
+BEGIN;
+
+ALTER TABLE answers ADD COLUMN IF NOT EXISTS path_to_explanation VARCHAR(500);
+
+UPDATE answers
+SET path_to_explanation = replace(path_to_answer, '_answer.png', '_steps.png')
+WHERE path_to_explanation IS NULL;
+
+COMMIT;
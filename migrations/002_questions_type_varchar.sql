@@ -0,0 +1,25 @@
+-- Converts questions.type from the Postgres questiontype ENUM to a
+-- VARCHAR(32) + CHECK column, matching QuestionDB's
+-- Enum(native_enum=False, create_constraint=True).
+--
+-- init_db's create_all never alters existing tables, so databases created
+-- while the column was a native ENUM need this run once:
+--   psql "$DATABASE_URL" -f migrations/002_questions_type_varchar.sql
+--
+-- The stored labels are the QuestionType member names, so existing rows
+-- pass the new constraint unchanged. Adding a subject later means
+-- replacing this constraint instead of ALTER TYPE ... ADD VALUE.
+
+BEGIN;
+
+ALTER TABLE questions ALTER COLUMN type TYPE VARCHAR(32) USING type::text;
+
+DROP TYPE IF EXISTS questiontype;
+
+-- Same name and member list SQLAlchemy emits for new tables
+ALTER TABLE questions ADD CONSTRAINT questiontype CHECK (type IN (
+    'MATH', 'ROMANIAN', 'HISTORY', 'PHYSICS', 'CHEMISTRY', 'BIOLOGY',
+    'GEOGRAPHY', 'COMPUTER_SCIENCE', 'ENGINEERING', 'OTHER'
+));
+
+COMMIT;
@@ -0,0 +1,20 @@
+-- Adds the questions indexes declared on QuestionDB after the table
+-- already existed: the (type, language, question_number) composite and
+-- the answer_id foreign-key index.
+--
+-- init_db's create_all only builds indexes together with a new table, so
+-- existing databases need this run once:
+--   psql "$DATABASE_URL" -f migrations/003_questions_indexes.sql
+--
+-- Run after 002 so the composite index is built on the VARCHAR column
+-- rather than rebuilt by the type conversion.
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS ix_q_type_lang_num
+    ON questions (type, language, question_number);
+
+CREATE INDEX IF NOT EXISTS ix_questions_answer_id
+    ON questions (answer_id);
+
+COMMIT;